@@ -7,7 +7,9 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 import json
+from collections import Counter
 from datetime import datetime
+from itertools import islice
 
 app = Flask(__name__)
 CORS(app)
@@ -15,14 +17,22 @@ CORS(app)
 # Path to computed metrics file
 METRICS_FILE = 'frontend/public/computed_metrics.json'
 
+# Parsed metrics cache, keyed by the file's (mtime, size) so a re-run of
+# compute_real_metrics.py is picked up without re-parsing on every request
+_metrics_cache = {'key': None, 'data': None}
+
 def load_metrics():
-    """Load computed metrics from JSON file"""
+    """Load computed metrics from JSON file (cached until the file changes)"""
     try:
-        if os.path.exists(METRICS_FILE):
-            with open(METRICS_FILE, 'r') as f:
-                return json.load(f)
-        else:
+        if not os.path.exists(METRICS_FILE):
             return None
+        stat = os.stat(METRICS_FILE)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if _metrics_cache['key'] != key:
+            with open(METRICS_FILE, 'r') as f:
+                _metrics_cache['data'] = json.load(f)
+            _metrics_cache['key'] = key
+        return _metrics_cache['data']
     except Exception as e:
         print(f"Error loading metrics: {e}")
         return None
@@ -40,14 +50,31 @@ def health_check():
 
 @app.route('/api/sites', methods=['GET'])
 def get_sites():
-    """Get all mining sites"""
+    """Get all mining sites (optionally paginated via limit/offset)"""
+    from flask import request
+
     data = load_metrics()
     if data is None:
         return jsonify({'error': 'Metrics not found'}), 404
-    
+
+    mines = data.get('mines', [])
+
+    # Clamp negatives: islice raises ValueError on negative indices
+    offset = max(0, request.args.get('offset', default=0, type=int))
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(0, limit)
+
+    if offset or limit is not None:
+        # islice iterates in place instead of copying the list slice
+        stop = None if limit is None else offset + limit
+        sites = list(islice(mines, offset, stop))
+    else:
+        sites = mines
+
     return jsonify({
-        'sites': data.get('mines', []),
-        'total': len(data.get('mines', []))
+        'sites': sites,
+        'total': len(mines)
     })
 
 
@@ -106,25 +133,37 @@ def get_statistics():
     
     metadata = data.get('metadata', {})
     mines = data.get('mines', [])
-    
-    # Calculate statistics
-    legal_sites = [m for m in mines if m['type'] == 'legal']
-    illegal_sites = [m for m in mines if m['type'] == 'illegal']
-    
-    legal_area = sum(m['area'] for m in legal_sites)
-    illegal_area = sum(m['area'] for m in illegal_sites)
-    
-    depths = [m['depth'] for m in mines if m['depth'] > 0]
-    avg_depth = sum(depths) / len(depths) if depths else 0
-    
+
+    # Calculate statistics in a single pass over the mines list
+    legal_count = illegal_count = 0
+    legal_area = illegal_area = 0.0
+    total_volume = 0.0
+    depth_sum = 0.0
+    depth_count = 0
+
+    for m in mines:
+        if m['type'] == 'legal':
+            legal_count += 1
+            legal_area += m['area']
+        elif m['type'] == 'illegal':
+            illegal_count += 1
+            illegal_area += m['area']
+        total_volume += m['volume']
+        depth = m['depth']
+        if depth > 0:
+            depth_sum += depth
+            depth_count += 1
+
+    avg_depth = depth_sum / depth_count if depth_count else 0
+
     return jsonify({
         'total_sites': metadata.get('total_mines', len(mines)),
-        'legal_sites': metadata.get('legal_mines', len(legal_sites)),
-        'illegal_sites': metadata.get('illegal_mines', len(illegal_sites)),
+        'legal_sites': metadata.get('legal_mines', legal_count),
+        'illegal_sites': metadata.get('illegal_mines', illegal_count),
         'total_area': metadata.get('total_area_ha', legal_area + illegal_area),
         'legal_area': metadata.get('legal_area_ha', legal_area),
         'illegal_area': metadata.get('illegal_area_ha', illegal_area),
-        'total_volume': metadata.get('total_volume_m3', sum(m['volume'] for m in mines)),
+        'total_volume': metadata.get('total_volume_m3', total_volume),
         'average_depth': round(avg_depth, 2)
     })
 
@@ -148,27 +187,25 @@ def search_sites():
     max_depth = request.args.get('maxDepth', type=float)
     site_type = request.args.get('type', '').lower()
     
-    # Filter mines
-    filtered = mines
-    
-    if operator:
-        filtered = [m for m in filtered if operator in m.get('operator', '').lower()]
-    
-    if min_area is not None:
-        filtered = [m for m in filtered if m['area'] >= min_area]
-    
-    if max_area is not None:
-        filtered = [m for m in filtered if m['area'] <= max_area]
-    
-    if min_depth is not None:
-        filtered = [m for m in filtered if m['depth'] >= min_depth]
-    
-    if max_depth is not None:
-        filtered = [m for m in filtered if m['depth'] <= max_depth]
-    
-    if site_type:
-        filtered = [m for m in filtered if m['type'] == site_type]
-    
+    # Filter mines in one pass instead of building an intermediate
+    # list per active filter
+    def matches(m):
+        if operator and operator not in m.get('operator', '').lower():
+            return False
+        if min_area is not None and m['area'] < min_area:
+            return False
+        if max_area is not None and m['area'] > max_area:
+            return False
+        if min_depth is not None and m['depth'] < min_depth:
+            return False
+        if max_depth is not None and m['depth'] > max_depth:
+            return False
+        if site_type and m['type'] != site_type:
+            return False
+        return True
+
+    filtered = [m for m in mines if matches(m)]
+
     return jsonify({
         'sites': filtered,
         'total': len(filtered),
@@ -204,6 +241,8 @@ def generate_report():
     else:
         selected_sites = mines
     
+    type_counts = Counter(m['type'] for m in selected_sites)
+
     report = {
         'generated_at': datetime.now().isoformat(),
         'format': format_type,
@@ -212,8 +251,8 @@ def generate_report():
         'summary': {
             'total_area': sum(m['area'] for m in selected_sites),
             'total_volume': sum(m['volume'] for m in selected_sites),
-            'legal_count': len([m for m in selected_sites if m['type'] == 'legal']),
-            'illegal_count': len([m for m in selected_sites if m['type'] == 'illegal'])
+            'legal_count': type_counts['legal'],
+            'illegal_count': type_counts['illegal']
         }
     }
     
@@ -7,12 +7,17 @@ Saves results to JSON for frontend consumption.
 
 import json
 import numpy as np
+
+try:
+    import orjson  # Optional: C-implemented JSON, falls back to stdlib json
+except ImportError:
+    orjson = None
 import rasterio
 from rasterio.mask import mask
-from shapely.geometry import shape, Polygon
+from rasterio.windows import Window
+from shapely.geometry import Polygon
 from shapely.ops import transform
 import pyproj
-from PIL import Image
 import cv2
 from pathlib import Path
 
@@ -24,15 +29,27 @@ class RealMiningMetricsCalculator:
         self.rgb_path = self.data_dir / 'Singrauli_Sentinel2_RGB.tif'
         self.image_path = self.data_dir / 'Singrauli_mines_image.jpeg'
         
-        # Load COCO annotations
-        with open(self.annotations_path, 'r') as f:
-            self.coco_data = json.load(f)
+        # Load COCO annotations (parsed in C by orjson when available)
+        with open(self.annotations_path, 'rb') as f:
+            raw = f.read()
+        self.coco_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+        # DEM raster cache: read once, reused for every mine
+        self._dem_data = None
         
         print(f"✓ Loaded {len(self.coco_data['annotations'])} mine annotations")
         
     def pixel_to_geo_coords(self, x, y, transform_matrix):
-        """Convert pixel coordinates to geographic coordinates using raster transform"""
-        lon, lat = rasterio.transform.xy(transform_matrix, y, x)
+        """
+        Convert pixel coordinates to geographic coordinates using raster transform.
+        Accepts scalars or NumPy arrays; whole vertex arrays are transformed
+        with two broadcast multiplies instead of one Python call per point.
+        Uses pixel centers, matching rasterio.transform.xy.
+        """
+        cols = np.asarray(x) + 0.5
+        rows = np.asarray(y) + 0.5
+        lon = transform_matrix.c + transform_matrix.a * cols + transform_matrix.b * rows
+        lat = transform_matrix.f + transform_matrix.d * cols + transform_matrix.e * rows
         return lon, lat
     
     def calculate_pixel_area_in_sqm(self, pixel_area, transform_matrix, crs):
@@ -63,6 +80,18 @@ class RealMiningMetricsCalculator:
         area_sqm = pixel_area * pixel_width_m * pixel_height_m
         return area_sqm
     
+    def mask_from_polygons(self, polygons_px, shape):
+        """
+        Rasterize one or more pixel-space polygons into a boolean mask.
+        All contours are passed to cv2.fillPoly in a single call so the
+        per-polygon OpenCV dispatch cost is paid once.
+        """
+        mask = np.zeros(shape, dtype=np.uint8)
+        contours = [np.round(np.asarray(p)).astype(np.int32).reshape(-1, 1, 2)
+                    for p in polygons_px]
+        cv2.fillPoly(mask, contours, 1)
+        return mask.view(bool)
+
     def polygon_from_segmentation(self, segmentation):
         """Convert COCO segmentation to Shapely Polygon (in pixel coordinates)"""
         coords = []
@@ -90,34 +119,22 @@ class RealMiningMetricsCalculator:
             # We need to map pixel coords to geo coords using the transform
             transform_matrix = dem_dataset.transform
             
-            # Sample points within the polygon
-            coords_list = list(polygon_geom.exterior.coords)
-            geo_coords = []
-            for x, y in coords_list:
-                # Scale pixel coordinates to DEM coordinates
-                # Map from image space (1500x719) to DEM space
-                dem_x = (x / img_width) * dem_dataset.width
-                dem_y = (y / img_height) * dem_dataset.height
-                geo_coords.append((dem_x, dem_y))
-            
-            # Create a polygon in DEM pixel space
-            dem_polygon = Polygon(geo_coords)
-            
-            # Read DEM data
-            dem_data = dem_dataset.read(1)
-            
-            # Create a mask for the polygon area
-            y_coords, x_coords = np.meshgrid(
-                np.arange(dem_dataset.height),
-                np.arange(dem_dataset.width),
-                indexing='ij'
-            )
-            
-            # Check which pixels are inside the polygon
-            points = np.column_stack((x_coords.ravel(), y_coords.ravel()))
-            mask_array = np.array([dem_polygon.contains(shape({'type': 'Point', 'coordinates': p})) 
-                                   for p in points]).reshape(dem_data.shape)
+            # Scale all vertices from image space (1500x719) to DEM space
+            # with one vectorized multiply instead of a per-vertex loop
+            coords = np.asarray(polygon_geom.exterior.coords)
+            geo_coords = coords * (dem_dataset.width / img_width,
+                                   dem_dataset.height / img_height)
             
+            # Read DEM data (cached after the first mine); float32 keeps the
+            # elevation arithmetic out of double precision
+            if self._dem_data is None:
+                self._dem_data = dem_dataset.read(1).astype(np.float32)
+            dem_data = self._dem_data
+
+            # Rasterize the polygon into a mask (single batched fillPoly
+            # call, no per-pixel point-in-polygon test)
+            mask_array = self.mask_from_polygons([geo_coords], dem_data.shape)
+
             # Get elevation values within the polygon
             elevations = dem_data[mask_array]
             
@@ -128,8 +145,6 @@ class RealMiningMetricsCalculator:
                 max_elevation = np.max(elevations)
                 
                 # Estimate reference elevation (surrounding area average)
-                # Use a buffer around the polygon for reference
-                buffer_mask = np.zeros_like(mask_array)
                 # Simple approach: use max elevation as reference
                 reference_elevation = max_elevation
                 
@@ -156,11 +171,10 @@ class RealMiningMetricsCalculator:
                     pixel_size_m2 = abs(dem_dataset.transform[0]) * abs(dem_dataset.transform[4])
                 
                 # Volume = sum of all height differences * pixel area
-                # Use the difference between reference (max) and each pixel elevation
-                height_differences = reference_elevation - elevations
-                # Only count positive differences (excavation below reference)
-                height_differences = height_differences[height_differences > 0]
-                volume = np.sum(height_differences) * pixel_size_m2
+                # Use the difference between reference (max) and each pixel elevation,
+                # clipping negative differences to zero so only excavation below
+                # the reference counts — one reduction, no filtered copy
+                volume = np.sum(np.clip(reference_elevation - elevations, 0, None)) * pixel_size_m2
                 
                 return {
                     'volume_m3': float(volume),
@@ -186,30 +200,25 @@ class RealMiningMetricsCalculator:
             img_width = image_info['width']
             img_height = image_info['height']
             
-            # Read RGB bands
-            red = rgb_dataset.read(1)
-            green = rgb_dataset.read(2)
-            blue = rgb_dataset.read(3)
-            
             # Sample RGB values within polygon (simplified approach)
             minx, miny, maxx, maxy = polygon_geom.bounds
-            
+
             # Scale to RGB image dimensions
             rgb_minx = int((minx / img_width) * rgb_dataset.width)
             rgb_maxx = int((maxx / img_width) * rgb_dataset.width)
             rgb_miny = int((miny / img_height) * rgb_dataset.height)
             rgb_maxy = int((maxy / img_height) * rgb_dataset.height)
-            
+
             # Clip to valid ranges
             rgb_minx = max(0, min(rgb_minx, rgb_dataset.width - 1))
             rgb_maxx = max(0, min(rgb_maxx, rgb_dataset.width - 1))
             rgb_miny = max(0, min(rgb_miny, rgb_dataset.height - 1))
             rgb_maxy = max(0, min(rgb_maxy, rgb_dataset.height - 1))
-            
-            # Extract region
-            r_region = red[rgb_miny:rgb_maxy, rgb_minx:rgb_maxx]
-            g_region = green[rgb_miny:rgb_maxy, rgb_minx:rgb_maxx]
-            b_region = blue[rgb_miny:rgb_maxy, rgb_minx:rgb_maxx]
+
+            # Read all three bands of the bounding-box window in one call
+            window = Window(rgb_minx, rgb_miny,
+                            rgb_maxx - rgb_minx, rgb_maxy - rgb_miny)
+            r_region, g_region, b_region = rgb_dataset.read([1, 2, 3], window=window)
             
             # Calculate average color
             if r_region.size > 0:
@@ -266,7 +275,12 @@ class RealMiningMetricsCalculator:
             crs = dem_ds.crs
             
             results = []
-            
+
+            # Build the category lookup once instead of scanning the
+            # categories list for every annotation
+            categories = {cat['id']: cat['name']
+                          for cat in self.coco_data['categories']}
+
             for idx, annotation in enumerate(self.coco_data['annotations']):
                 print(f"\n[{idx+1}/{len(self.coco_data['annotations'])}] Processing mine...")
                 
@@ -275,9 +289,7 @@ class RealMiningMetricsCalculator:
                 polygon = self.polygon_from_segmentation(segmentation)
                 
                 # Get category name
-                category = next((cat for cat in self.coco_data['categories'] 
-                               if cat['id'] == annotation['category_id']), None)
-                mine_name = category['name'] if category else f"Mine_{idx+1}"
+                mine_name = categories.get(annotation['category_id'], f"Mine_{idx+1}")
                 
                 # Calculate real area in square meters
                 # IMPORTANT: COCO annotations are in JPEG image pixel space (1500x719)
@@ -392,10 +404,12 @@ class RealMiningMetricsCalculator:
                 # Add polygon coordinates for frontend
                 # IMPORTANT: Invert Y coordinate because Leaflet's (0,0) is top-left
                 # but the polygons appear flipped, so we need to flip Y
-                mine_metrics['coordinates'] = [
-                    [img_height - segmentation[i+1], segmentation[i]]  # Flip Y: [imageHeight - y, x]
-                    for i in range(0, len(segmentation), 2)
-                ]
+                # Coordinates are display-only pixel positions, so round to
+                # whole pixels to keep the JSON payload compact
+                seg_xy = np.asarray(segmentation, dtype=float).reshape(-1, 2)
+                mine_metrics['coordinates'] = np.column_stack(
+                    (img_height - seg_xy[:, 1], seg_xy[:, 0])  # Flip Y: [imageHeight - y, x]
+                ).round().astype(int).tolist()
                 
                 results.append(mine_metrics)
             
@@ -426,8 +440,18 @@ class RealMiningMetricsCalculator:
             'mines': results
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        if orjson is not None:
+            # Serialize before opening the file so a failure cannot truncate
+            # the previously computed metrics. OPT_SERIALIZE_NUMPY covers the
+            # np.float64 scalars the metric calculations produce.
+            payload = orjson.dumps(
+                output_data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            with open(output_file, 'wb') as f:
+                f.write(payload)
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(output_data, f, indent=2)
         
         print(f"\n{'='*60}")
         print("COMPUTATION COMPLETE")
@@ -38,6 +38,37 @@ const Dashboard = () => {
 
   const { metadata, mines } = miningData
 
+  const statCards = [
+    {
+      title: 'Total Mining Sites',
+      value: metadata.total_mines,
+      unit: 'sites',
+      icon: Mountain,
+      color: 'info',
+    },
+    {
+      title: 'Authorized Sites',
+      value: metadata.legal_mines,
+      unit: 'sites',
+      icon: TrendingUp,
+      color: 'success',
+    },
+    {
+      title: 'Unauthorized Sites',
+      value: metadata.illegal_mines,
+      unit: 'sites',
+      icon: AlertTriangle,
+      color: 'danger',
+    },
+    {
+      title: 'Total Area',
+      value: (metadata.total_area_hectares / 1000).toFixed(2),
+      unit: 'km²',
+      icon: Layers,
+      color: 'info',
+    },
+  ]
+
   return (
     <div className="space-y-8 animate-fade-in">
       {/* Page Header */}
@@ -58,34 +89,9 @@ const Dashboard = () => {
 
       {/* Stats Grid */}
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
-        <StatCard
-          title="Total Mining Sites"
-          value={metadata.total_mines}
-          unit="sites"
-          icon={Mountain}
-          color="info"
-        />
-        <StatCard
-          title="Authorized Sites"
-          value={metadata.legal_mines}
-          unit="sites"
-          icon={TrendingUp}
-          color="success"
-        />
-        <StatCard
-          title="Unauthorized Sites"
-          value={metadata.illegal_mines}
-          unit="sites"
-          icon={AlertTriangle}
-          color="danger"
-        />
-        <StatCard
-          title="Total Area"
-          value={(metadata.total_area_hectares / 1000).toFixed(2)}
-          unit="km²"
-          icon={Layers}
-          color="info"
-        />
+        {statCards.map((card) => (
+          <StatCard key={card.title} {...card} />
+        ))}
       </div>
 
       {/* Mining Sites Distribution */}